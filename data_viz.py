@@ -1,6 +1,7 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
 def plot_temperature_trend(nasa_data):
@@ -217,6 +218,18 @@ def plot_multi_parameter_timeline(nasa_data):
     plt.tight_layout()
     return fig
 
+@contextmanager
+def managed_fig(fig):
+    """
+    Close a figure once the block is done with it, even if rendering fails
+    Closes that exact figure rather than pyplot's "current" one
+    """
+    try:
+        yield fig
+    finally:
+        if fig is not None:
+            plt.close(fig)
+
 # Helper function to integrate with Streamlit
 def display_nasa_charts(st, nasa_data):
     """
@@ -228,27 +241,27 @@ def display_nasa_charts(st, nasa_data):
     tab1, tab2, tab3, tab4 = st.tabs(["🌡️ Temperature", "🌧️ Precipitation", "💧 Soil Moisture", "📈 All Data"])
     
     with tab1:
-        fig = plot_temperature_trend(nasa_data)
-        if fig:
-            st.pyplot(fig)
+        with managed_fig(plot_temperature_trend(nasa_data)) as fig:
+            if fig:
+                st.pyplot(fig)
     
     with tab2:
-        fig = plot_precipitation_bars(nasa_data)
-        if fig:
-            st.pyplot(fig)
+        with managed_fig(plot_precipitation_bars(nasa_data)) as fig:
+            if fig:
+                st.pyplot(fig)
     
     with tab3:
         if nasa_data:
             params = nasa_data['properties']['parameter']
             soil_values = list(params['GWETROOT'].values())
             current_moisture = soil_values[-1] if soil_values else 0.4
-            fig = plot_soil_moisture_gauge(current_moisture)
-            st.pyplot(fig)
+            with managed_fig(plot_soil_moisture_gauge(current_moisture)) as fig:
+                st.pyplot(fig)
     
     with tab4:
-        fig = plot_multi_parameter_timeline(nasa_data)
-        if fig:
-            st.pyplot(fig)
+        with managed_fig(plot_multi_parameter_timeline(nasa_data)) as fig:
+            if fig:
+                st.pyplot(fig)
 
 # Export all functions
 __all__ = [
@@ -258,5 +271,6 @@ __all__ = [
     'plot_comparison_chart',
     'create_yield_progress_bar',
     'plot_multi_parameter_timeline',
-    'display_nasa_charts'
+    'display_nasa_charts',
+    'managed_fig'
 ]